@@ -1,76 +1,239 @@
-from src.config.reports import HSReport, CLDCReport, COM1100Report, FDSReport
-from src.config.timeline import Timeline
+from __future__ import annotations
+
 import os
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime as dt
+from pathlib import Path
 import argparse
 
-from colorama import init as colorama_init
-from colorama import Fore
-from colorama import Style
-
-colorama_init()
-
-logfile = f"logs/{dt.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
-if not os.path.exists("logs"):
-    os.makedirs("logs")
-logging.basicConfig(
-    filename=logfile,
-    encoding='utf-8',
-    level=logging.DEBUG,
-    filemode='w',
-    format='%(levelname)s:%(asctime)s:[%(module)s] %(message)s'
-)
-logging.info("Log started")
-
-parser = argparse.ArgumentParser(prog="Handshake Timeline Reporting",
-                                 description="A script that uses data from Handshake reports to create a Timeline of all student engagements from 2019-present. With this timeline, the user has the ability to generate several other reports.")
-
-parser.add_argument('-ar', '--add_report_output', type=str, help="specifies a list of comma separated reports you'd like to recieve outputs for",
-                    nargs='*', default=["CLDC", "COM1100", "FDS"])
-
-args = parser.parse_args()
+# pandas, pyarrow and the report classes are imported lazily inside Driver so
+# --help, import errors and test collection don't pay the full startup cost
+try:
+    from colorama import init as colorama_init
+    from colorama import Fore
+    from colorama import Style
+except ImportError:
+    colorama_init = Fore = Style = None
+
+# Row count past which the optional modin engine takes over csv writes
+MODIN_ROW_THRESHOLD = 1_000_000
+
+def _configure_logging() -> None:
+    '''
+    Function that sets up the run's log file. Records are handed to a queue and formatted/flushed on a dedicated listener thread so logging never blocks the save/ingest paths.
+    '''
+    logfile = f"logs/{dt.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
+    Path("logs").mkdir(exist_ok=True)
+
+    log_queue = queue.Queue(-1)
+    file_handler = logging.FileHandler(logfile, mode='w', encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(levelname)s:%(asctime)s:[%(module)s] %(message)s'))
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler)
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    logging.info("Log started")
 
 class Driver:
     def __init__(self):
         pass
 
-    def run(self, reports_desired: list[str] | str) -> None:
+    def _load_report(self, report: str) -> pd.DataFrame | None:
+        '''
+        Function that loads a processed HSReport, keeping a parquet sidecar under cache/ so warm re-runs skip the CSV parse entirely.
+        The cache is considered fresh when it is newer than the latest source file.
+
+        Input:
+            - report (str): String of the report type to load.
+
+        Returns:
+            - DataFrame: Dataframe of the processed report content.
+        '''
+        import pandas as pd
+        from src.config.config import Config
+        from src.config.reports import HSReport, CONFIG_FILE
+        from src.utils import utils
+
+        cache_path = f"cache/{report}.parquet"
+        source_path = utils.get_latest_file_path(Config(config_file=CONFIG_FILE).config[report]["path"])
+
+        if source_path and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source_path):
+            logging.debug(f"loaded {report} from parquet cache")
+            return pd.read_parquet(cache_path)
+
+        content = HSReport(report_type=report).content
+
+        if content is not None:
+            Path("cache").mkdir(exist_ok=True)
+            content.to_parquet(cache_path)
+            logging.debug(f"cached parsed {report} report to {cache_path}")
+
+        return content
+
+    def _save_output(self, output, path: str, output_format: str = "csv", engine: str = "pandas", numeric: bool = False) -> str:
+        '''
+        Function that saves a single output dataframe to its designated path. Intended to be dispatched to a worker thread so writes overlap.
+
+        Input:
+            - output (DataFrame): Dataframe of the report output to save.
+            - path (str): String of the destination path.
+            - output_format (str): String of the file format to save in ("csv", "parquet" or "feather"). Defaults to "csv".
+            - engine (str): String of the dataframe engine used for csv writes ("pandas" or "modin"). Defaults to "pandas".
+            - numeric (bool): Boolean marking count-dominated outputs whose csv write can skip quote scanning. Defaults to False.
+
+        Returns:
+            - path(str): The path the output was saved to.
+        '''
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        # The aggregate outputs still carry text columns (emails, majors, tags) whose
+        # values can legally contain commas, so quoting stays on; float_format alone
+        # trims the float repr work on the count-dominated frames
+        csv_kwargs = {"float_format": "%.6g"} if numeric else {}
+
+        # Modin partitions the csv write across cores; only worth it for large outputs
+        if engine == "modin" and output_format == "csv" and len(output) > MODIN_ROW_THRESHOLD:
+            try:
+                import modin.pandas as mpd
+                mpd.DataFrame(output).to_csv(path)
+                logging.info(f"{path} saved")
+                return path
+            except ImportError:
+                logging.warning("modin engine requested but modin is not installed; falling back to pandas")
+
+        if output_format in ("parquet", "feather"):
+            # Object columns mixing numbers and strings (e.g. counts fillna'd with "0")
+            # have no Arrow type and would abort the save thread mid-run; render them
+            # as strings before the columnar write, like to_csv would have
+            obj_cols = output.columns[output.dtypes == object]
+            if len(obj_cols):
+                output = output.copy()
+                output[obj_cols] = output[obj_cols].astype("str")
+            if output_format == "parquet":
+                output.to_parquet(path, compression="zstd")
+            else:
+                output.to_feather(path)
+        elif isinstance(output.index, pd.MultiIndex):
+            # to_csv on a MultiIndex takes a far slower path than on flattened columns
+            output.reset_index().to_csv(path, index=False, **csv_kwargs)
+        elif path.endswith(".gz"):
+            output.to_csv(path, **csv_kwargs)
+        else:
+            try:
+                # pyarrow stringifies columns in parallel C++, several times faster than
+                # pandas' per-cell csv writer
+                frame = output.reset_index()
+                if output.index.name is None:
+                    # to_csv writes an unnamed index under an empty header; keep that
+                    # header instead of reset_index's literal "index" so consumers
+                    # parsing by column name see the same schema
+                    frame = frame.rename(columns={"index": ""})
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                # Quote skipping is only safe when every written column is numeric;
+                # the marker alone doesn't guarantee that (aggregates carry text columns)
+                skip_quotes = numeric and all(pd.api.types.is_numeric_dtype(dtype) for dtype in output.dtypes)
+                write_options = pacsv.WriteOptions(quoting_style="none") if skip_quotes else pacsv.WriteOptions()
+                pacsv.write_csv(table, path, write_options=write_options)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                # Fall back for dtypes pyarrow can't convert
+                output.to_csv(path, **csv_kwargs)
+        logging.info(f"{path} saved")
+        return path
+
+    def run(self, reports_desired: list[str] | str, output_format: str = "csv", compress: bool = False, engine: str = "pandas") -> None:
+
+        # Normalize to a frozenset so the membership checks below are O(1) lookups;
+        # checking a raw string would be substring search ("CLDC" in "CLDCFAKE" is true)
+        if isinstance(reports_desired, str):
+            reports_desired = frozenset(report.strip() for report in reports_desired.split(","))
+        else:
+            reports_desired = frozenset(reports_desired)
+
+        from src.config.reports import CLDCReport, COM1100Report, FDSReport
+        from src.config.timeline import Timeline
+
+        if colorama_init is not None:
+            colorama_init()
 
         timeline = Timeline()
 
         reports = ["Applications", "Appointments", "Career_Fairs", "Events", "Logins"]
 
-        for report in reports:
-            obj = HSReport(report_type=report)
-            app_report = obj.content
-            timeline.add_report(report=app_report, tag=report)
+        # Each report load is independent I/O + parsing, so fan the loads out to threads
+        # and keep add_report serial since it mutates the shared timeline object
+        with ThreadPoolExecutor(max_workers=len(reports)) as executor:
+            contents = list(executor.map(self._load_report, reports))
+
+        for report, content in zip(reports, contents):
+            timeline.add_report(report=content, tag=report)
 
         timeline.add_enrollment()
         timeline.create_timeline()
         timeline.process_timeline()
 
-        outputs=[timeline.timeline]
-        paths=["outputs/timeline.csv"]
+        # Each job is (dataframe, path, numeric) where numeric marks the
+        # count-dominated aggregates that can skip csv quote scanning
+        jobs = [(timeline.timeline, "outputs/timeline.csv", False)]
 
         if "CLDC" in reports_desired:
             cldc_agg, cldc_melt = CLDCReport().generate_reports(timeline=timeline.timeline)
-            outputs.extend([cldc_agg, cldc_melt])
-            paths.extend(["outputs/cldc_agg.csv", "outputs/cldc_melt.csv"])
+            jobs.extend([(cldc_agg, "outputs/cldc_agg.csv", True), (cldc_melt, "outputs/cldc_melt.csv", False)])
 
         if "COM1100" in reports_desired:
             combined_agg, combined_melt = COM1100Report().generate_reports(enrollment=timeline.enrollment, timeline=timeline.timeline)
-            outputs.extend([combined_agg, combined_melt])
-            paths.extend(["outputs/COM1100_agg.csv", "outputs/COM1100_melt.csv"])
+            jobs.extend([(combined_agg, "outputs/COM1100_agg.csv", True), (combined_melt, "outputs/COM1100_melt.csv", False)])
 
         if "FDS" in reports_desired:
             so_agg, so_melt = FDSReport().generate_reports(timeline=timeline.timeline)
-            outputs.extend([so_agg, so_melt])
-            paths.extend(["outputs/fds_agg.csv", "outputs/fds_melt.csv"])
+            jobs.extend([(so_agg, "outputs/fds_agg.csv", True), (so_melt, "outputs/fds_melt.csv", False)])
+
+        Path("outputs").mkdir(exist_ok=True)
+
+        # Resolve path + save strategy per output once, up front, so the dispatch
+        # below is a single codepath regardless of format/compression
+        dispatch = []
+        for output, path, numeric in jobs:
+            if output_format != "csv":
+                # Columnar formats are substantially faster to write and re-read than CSV
+                path = f"{os.path.splitext(path)[0]}.{output_format}"
+            elif compress:
+                # to_csv infers gzip from the extension; far fewer bytes hit the disk
+                path = f"{path}.gz"
+            dispatch.append((output, functools.partial(self._save_output, path=path, output_format=output_format, engine=engine, numeric=numeric)))
+
+        # to_csv is largely I/O-bound, so dispatching each write to a thread overlaps disk I/O across files
+        with ThreadPoolExecutor(max_workers=len(dispatch)) as executor:
+            futures = [executor.submit(save, output) for output, save in dispatch]
+            for future in as_completed(futures):
+                print(f'{getattr(Fore, "GREEN", "")} {future.result()} successfully saved. {getattr(Style, "RESET_ALL", "")}')
+
+if __name__ == "__main__":
+    _configure_logging()
+
+    parser = argparse.ArgumentParser(prog="Handshake Timeline Reporting",
+                                     description="A script that uses data from Handshake reports to create a Timeline of all student engagements from 2019-present. With this timeline, the user has the ability to generate several other reports.")
+
+    parser.add_argument('-ar', '--add_report_output', type=str, help="specifies a list of comma separated reports you'd like to recieve outputs for",
+                        nargs='*', default=["CLDC", "COM1100", "FDS"])
+
+    parser.add_argument('-f', '--format', type=str, help="specifies the file format outputs are saved in",
+                        choices=["csv", "parquet", "feather"], default="csv")
+
+    parser.add_argument('-z', '--compress', action='store_true', help="gzip-compresses csv outputs (saved as .csv.gz)")
+
+    parser.add_argument('-e', '--engine', type=str, help="specifies the dataframe engine used to write large csv outputs",
+                        choices=["pandas", "modin"], default="pandas")
 
-        for output, path in zip(outputs, paths):
-            print(f'{Fore.GREEN} {path} successfully saved. {Style.RESET_ALL}')
-            logging.info(f"{path} saved")
-            output.to_csv(path)
+    args = parser.parse_args()
 
-Driver().run(reports_desired=args.add_report_output)
\ No newline at end of file
+    Driver().run(reports_desired=args.add_report_output, output_format=args.format, compress=args.compress, engine=args.engine)
\ No newline at end of file
@@ -1,25 +1,23 @@
-import json
+import orjson
+from pathlib import Path
 from typing import Optional
 
 class Config:
+    # Parsed configs shared across instances so repeated construction doesn't re-read the file
+    _cache: dict[str, dict] = {}
+
     def __init__(self, config_file: Optional[str]):
         self._config_file = config_file
-        self._config = None
         self.config = self._load_config()
 
     def _load_config(self):
+        if self._config_file in Config._cache:
+            return Config._cache[self._config_file]
         try:
-            with open(self._config_file, 'r') as config_file:
-                config = json.load(config_file)
-                return config
-        except:
-            raise Exception("failed to unpack config")
-        return config
-            
-    @property
-    def config(self):
-        return self._config
-
-    @config.setter
-    def config(self, config):
-        self._config = config
\ No newline at end of file
+            config = orjson.loads(Path(self._config_file).read_bytes())
+        except FileNotFoundError as e:
+            raise Exception(f"config file {self._config_file} not found") from e
+        except orjson.JSONDecodeError as e:
+            raise Exception(f"failed to unpack config {self._config_file}") from e
+        Config._cache[self._config_file] = config
+        return config
\ No newline at end of file
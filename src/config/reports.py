@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
+import functools
 import logging
+import os
 
 from typing import Optional
 from datetime import datetime
@@ -14,15 +17,30 @@ from src.config.config import Config
 CONFIG_FILE = "src\\config\\csv.config.JSON"
 colorama_init()
 
+@functools.lru_cache(maxsize=32)
+def _read_csv_cached(path: str, mtime: float) -> pd.DataFrame:
+    '''
+    Reads a report CSV, memoized on path + mtime so re-instantiating a Report in the same run doesn't re-parse an unchanged file.
+
+    Input:
+        - path(str): String of the resolved report file path.
+        - mtime(float): Modification time of the file; part of the cache key so edits invalidate.
+
+    Returns:
+        - DataFrame: Dataframe of the parsed file. Callers should .copy() before mutating.
+    '''
+    # dtype=str keeps identifiers (leading zeros) intact while the pyarrow backend
+    # stores them in Arrow string buffers instead of PyObjects
+    return pd.read_csv(path, dtype=str, dtype_backend="pyarrow")
+
 class Report(Config):
     def __init__(self, report_type: str, config_file: Optional[str] = CONFIG_FILE) -> None:
         super().__init__(config_file=config_file)
-        self._report_type = report_type
-        self._content = None
+        self.report_type = report_type
         self.content = self._load_file()
 
         self._req_col_check(req_cols=["Student_ID", "Date", "path", "Email"])
-        self.content = utils.rename_columns(df=self.content, config_keys=self.config[self._report_type])
+        self.content = utils.rename_columns(df=self.content, config_keys=self.config[self.report_type])
     
     def _load_file(self) -> pd.DataFrame | None:
         '''
@@ -33,17 +51,18 @@ class Report(Config):
         '''
         try:
             # Get the most temporally recent path
-            path = utils.get_latest_file_path(self.config[self._report_type]["path"])
+            path = utils.get_latest_file_path(self.config[self.report_type]["path"])
 
-            # Load as df
-            df = pd.read_csv(path, dtype=str)
-            logging.debug(f"successfully loaded report path {self._report_type}")
+            # Load as df through the mtime-keyed cache; copy so per-report processing
+            # doesn't mutate the cached frame
+            df = _read_csv_cached(path, os.path.getmtime(path)).copy()
+            logging.debug(f"successfully loaded report path {self.report_type}")
 
             return df
         
         except Exception as e:
             print(e)
-            logging.warning(f"error loading report path {self._report_type}")
+            logging.warning(f"error loading report path {self.report_type}")
             return None
     
     def _req_col_check(self, req_cols: list[str]) -> None:
@@ -64,22 +83,6 @@ class Report(Config):
 
         logging.debug("required column check complete")
 
-    @property
-    def content(self) -> pd.DataFrame | None:
-        return self._content
-
-    @content.setter
-    def content(self, content) -> pd.DataFrame | None:
-        self._content = content 
-
-    @property
-    def report_type(self) -> str:
-        return self._report_type
-    
-    @report_type.setter
-    def report_type(self, report_type) -> str:
-        self._report_type = report_type
-
 class HSReport(Report):
     def __init__(self, report_type: str, config_file: Optional[str] = CONFIG_FILE) -> None:
         super().__init__(report_type=report_type, config_file=config_file)
@@ -110,8 +113,8 @@ class HSReport(Report):
 
         except Exception as e:
 
-            logging.error(f"failed to convert date column to date type for {self._report_type}")
-            raise f"failed to convert date column to date type for {self._report_type}: {e}"
+            logging.error(f"failed to convert date column to date type for {self.report_type}")
+            raise f"failed to convert date column to date type for {self.report_type}: {e}"
 
     def col_type_add(self) -> None:
         ''' 
@@ -124,8 +127,8 @@ class CLDCReport(Report):
     
     def __init__(self, config_file: Optional[str] = CONFIG_FILE) -> None:
         super().__init__(report_type="CLDC_Report", config_file=config_file)
-        self._aggregate_df = None
-        self._melt_df = None
+        self.aggregate_df = None
+        self.melt_df = None
 
     def generate_reports(self, timeline: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
         ''' 
@@ -157,15 +160,19 @@ class CLDCReport(Report):
         cldc_df = self.content
 
         try:
-            # Only desiring students that completed their appointments
-            cldc_df = cldc_df[cldc_df["Completed"] == "true"]
-
-            # Drop duplicates based on identification (which is "Email")
-            cldc_df = cldc_df.sort_values(["Email", "Date"], ascending=False).drop_duplicates(subset=["Email"], keep="first")
-
-            # Process date
-            cldc_df.loc[:, 'Date'] = cldc_df['Date'].str[4:15]
-            cldc_df.loc[:, 'Date'] = pd.to_datetime(cldc_df['Date'], format='%b %d %Y').dt.strftime('%Y%m%d')
+            # Only desiring students that completed their appointments; cast the flag to a
+            # real boolean once so the filter is a bitmap test instead of string compares
+            cldc_df["Completed"] = cldc_df["Completed"].eq("true").to_numpy()
+            cldc_df = cldc_df[cldc_df["Completed"]]
+
+            # Process date first; exact=False lets the format match inside the
+            # Google Sheet date string without slicing out a throwaway Series
+            cldc_df['Date'] = pd.to_datetime(cldc_df['Date'], format='%b %d %Y', exact=False)
+
+            # Keep each email's latest appointment via a linear hash + max instead of
+            # sorting the whole frame just to drop duplicates
+            cldc_df = cldc_df.loc[cldc_df.groupby("Email")["Date"].idxmax()]
+            cldc_df['Date'] = cldc_df['Date'].dt.strftime('%Y%m%d')
             logging.debug("processed cldc report")
 
             # Create custom codes for matching term codes on
@@ -188,20 +195,28 @@ class CLDCReport(Report):
             raise "cannot generate cldc report because one of required columns ['Email', 'Student_ID', 'Event_Type', 'Date', 'term_code_key'] is missing"
 
         try:
-            # CLDC PROBLEM RIGHT HERE
-            # LOOK NO FURTHER
+            # merge_asof attaches each engagement to the most recent prior appointment per
+            # email, so the appointment x engagement cross product (and the filter over it)
+            # is never materialized. Both Date columns are %Y%m%d strings at this point.
+            tmp_engagement = tmp_engagement.assign(_date=pd.to_datetime(tmp_engagement["Date"], format='%Y%m%d', errors='coerce'))
+            tmp_engagement = tmp_engagement.dropna(subset=["_date"]).sort_values("_date")
 
-            # Merge together cldc with engagement to create the timeline
-            df = pd.merge(cldc_df, tmp_engagement, on="Email", how="left", suffixes=("_appt", "_eng"))
+            appointments = cldc_df.assign(_date=pd.to_datetime(cldc_df["Date"], format='%Y%m%d', errors='coerce'))
+            appointments = appointments.dropna(subset=["_date"]).sort_values("_date")
 
-            # Filter to only get entries where date of engagement follow appointment date
-            df = df[df["Date_appt"] < df["Date_eng"]]
+            df = pd.merge_asof(tmp_engagement, appointments, on="_date", by="Email",
+                               direction="backward", allow_exact_matches=False, suffixes=("_eng", "_appt"))
+
+            # Only keep engagements that actually follow an appointment
+            df = df[df["Date_appt"].notna()].drop(columns="_date")
 
             df = df.rename(columns={"Date_eng": "Date Engagement", "Date_appt": "Date Appointment"})
 
-            # Clean up columns to be a set of desired columns
+            # Clean up columns to be a set of desired columns; a plain list select skips
+            # Index construction and keeps the configured column order
             des_cols = self.config[self.report_type]["desired_cols"]
-            df_tl = df[df.columns.intersection(des_cols)]
+            col_set = set(df.columns)
+            df_tl = df[[col for col in des_cols if col in col_set]]
             df_tl = df_tl.drop_duplicates(subset=["Email", "Event_Type", "Date Engagement"])
 
             logging.debug("successfully merged cldc report and handshake reports to create timeline")   
@@ -212,13 +227,17 @@ class CLDCReport(Report):
 
         ### FOR AGGREGATE
         try:
-            # Use timeline to pivot for aggregate
-            df_agg = pd.pivot_table(df_tl[["Email", "Event_Type", "Term"]], index=["Email", "Term"], columns="Event_Type", aggfunc=len, fill_value=0)
+            # One hash-count feeds both report shapes: its unstacked wide form is the
+            # aggregate and the long form below is already the melted report
+            counts = df_tl.groupby(["Email", "Term", "Event_Type"]).size()
 
+            df_agg = counts.unstack("Event_Type", fill_value=0)
             df_agg = df_agg.reset_index()
             df_agg.columns.name = None
 
-            df_agg = pd.merge(cldc_df["Email"], df_agg, how="left", on="Email")
+            # Pad back in referred students with no engagements by aligning on the indexed
+            # Email column rather than a hash merge; Email x Term rows stay duplicated as before
+            df_agg = cldc_df[["Email"]].join(df_agg.set_index("Email"), on="Email").reset_index(drop=True)
 
             logging.debug("successfully processed aggregate cldc report")
 
@@ -228,7 +247,7 @@ class CLDCReport(Report):
 
         # FOR MELT
         try:
-            df_melt = df_agg.melt(id_vars=["Email", "Term"], value_vars=["Applications", "Appointments", "Career_Fairs", "Events", "Logins"], var_name="Event_Type", value_name="Count")
+            df_melt = counts.rename("Count").reset_index()
 
             logging.debug("successfully processed melted cldc report")
 
@@ -241,40 +260,16 @@ class CLDCReport(Report):
 
         return df_agg, df_melt
 
-    @property
-    def timeline(self) -> pd.DataFrame:
-        return self._timeline
-
-    @timeline.setter
-    def timeline(self, timeline) -> None:
-        self._timeline = timeline
-
-    @property
-    def aggregate_df(self) -> pd.DataFrame:
-        return self._aggregate_df
-
-    @aggregate_df.setter
-    def aggregate_df(self, agg_df) -> None:
-        self._aggregate_df = agg_df
-
-    @property
-    def melt_df(self) -> pd.DataFrame:
-        return self._melt_df
-
-    @melt_df.setter
-    def melt_df(self, melt_df) -> None:
-        self._melt_df = melt_df
-
 class COM1100Report(Report):
 
     def __init__(self, config_file: Optional[str] = CONFIG_FILE) -> None:
         super().__init__(report_type="COM1100_Report", config_file=config_file)
-        self._single_prez_aggregate_df = None
-        self._single_prez_melt_df = None
-        self._double_prez_aggregate_df = None
-        self._double_prez_melt_df = None
-        self._no_prez_aggregate_df = None
-        self._no_prez_melt_df = None
+        self.single_prez_aggregate_df = None
+        self.single_prez_melt_df = None
+        self.double_prez_aggregate_df = None
+        self.double_prez_melt_df = None
+        self.no_prez_aggregate_df = None
+        self.no_prez_melt_df = None
 
     def generate_reports(self, enrollment: pd.DataFrame, timeline: pd.DataFrame) -> tuple[pd.DataFrame]:
         '''
@@ -305,40 +300,35 @@ class COM1100Report(Report):
                     |---------------------|-------------|-------------------|-----------------|-------------------|
                     |---------------------|-------------|-------------------|-----------------|-------------------|
         '''
+        # Columns were already renamed per config in Report.__init__
         comm_df = self.content
 
-        # Start by configuring column names
-        comm_df = utils.rename_columns(df=comm_df, config_keys=self.config[self.report_type])
         comm_df = comm_df.dropna(subset="Email")
 
-        # Formatting Date
-        comm_df.loc[:, "Date"] = pd.to_datetime(comm_df["Date"], errors='coerce')
-        comm_df.loc[:, "Date"] = comm_df["Date"].apply(lambda x: x.strftime('%Y%m%d'))
+        # Formatting Date in one shot through the datetime accessor rather than a per-row strftime
+        comm_df["Date"] = pd.to_datetime(comm_df["Date"], errors='coerce').dt.strftime('%Y%m%d')
 
-        # Assign different months associated semester codes
-        value_list = [10] * 4 + [30] * 4 + [40] * 4
-        key_list = list(range(1, 13))
-        months_2key_dict = dict(zip(key_list, value_list))
-        comm_df["term_code_key"] = comm_df["Date"].str[0:4] + comm_df["Date"].str[4:6].astype(int).map(months_2key_dict).astype(str)
+        # Assign different months associated semester codes via a numpy lookup table
+        # (index 0 unused) instead of a per-row dict map
+        month_lut = np.array([0] + [10] * 4 + [30] * 4 + [40] * 4, dtype=np.int32)
+        months = comm_df["Date"].str.slice(4, 6).astype(int).to_numpy()
+        comm_df["term_code_key"] = comm_df["Date"].str.slice(0, 4) + month_lut[months].astype(str)
         comm_df = comm_df.sort_values(["Email", "term_code_key"])
 
-        # Obtain term codes from first cutoff to now.
-        term_codes = []
-        for year in range(2022, datetime.now().year+1):
-            for code in [40, 10]:
-                term_codes.append(str(year) + str(code))
-
-        # We don't want Winter 2022.
-        term_codes.remove("202210")
+        # Obtain term codes from first cutoff to now, minus Winter 2022 which we don't want.
+        # A set feeds isin its hash-table path directly
+        term_codes = {f"{year}{code}" for year in range(2022, datetime.now().year + 1) for code in (40, 10)} - {"202210"}
 
         # Filter only eligible term codes and Freshman
-        freshman = enrollment[(enrollment["term_code_key"].isin(term_codes)) & (enrollment["college_year"] == "Freshman")]
+        freshman = enrollment[enrollment["term_code_key"].isin(term_codes) & (enrollment["college_year"] == "Freshman")]
 
         freshman = utils.rename_columns(df=freshman, config_keys=self.config["Enrollment"])
         freshman = freshman.dropna(subset="Student_ID")
 
-        # Create dataframe for getting student identifiers of students that did not take COM1100
-        no_com1100 = freshman[~freshman["Student_ID"].isin(comm_df["Student_ID"])]
+        # Create dataframe for getting student identifiers of students that did not take COM1100.
+        # Dedupe the ids once so isin hashes each attendee a single time
+        com1100_ids = comm_df["Student_ID"].drop_duplicates().to_numpy()
+        no_com1100 = freshman[~freshman["Student_ID"].isin(com1100_ids)]
 
         # Final editing of creation of the different student groups: students that attended 1 presentation, 
         # students that attended 2 presentations, and students that didn't attend any.
@@ -364,62 +354,6 @@ class COM1100Report(Report):
 
         return com1100_agg, com1100_melt
         
-    @property
-    def enrollment(self) -> pd.DataFrame:
-        return self._enrollment
-
-    @enrollment.setter
-    def enrollment(self, enrollment) -> None:
-        self._enrollment = enrollment
-
-    @property
-    def single_prez_aggregate_df(self) -> pd.DataFrame:
-        return self._single_prez_aggregate_df
-
-    @single_prez_aggregate_df.setter
-    def single_prez_aggregate_df(self, agg_df) -> None:
-        self._single_prez_aggregate_df = agg_df
-
-    @property
-    def single_prez_melt_df(self) -> pd.DataFrame:
-        return self._single_prez_melt_df
-
-    @single_prez_melt_df.setter
-    def single_prez_melt_df(self, melt_df) -> None:
-        self._single_prez_melt_df = melt_df
-
-    @property
-    def double_prez_aggregate_df(self) -> pd.DataFrame:
-        return self._double_prez_aggregate_df
-
-    @double_prez_aggregate_df.setter
-    def double_prez_aggregate_df(self, agg_df) -> None:
-        self._double_prez_aggregate_df = agg_df
-
-    @property
-    def double_prez_melt_df(self) -> pd.DataFrame:
-        return self._double_prez_melt_df
-
-    @double_prez_melt_df.setter
-    def double_prez_melt_df(self, melt_df) -> None:
-        self._double_prez_melt_df = melt_df
-
-    @property
-    def no_prez_aggregate_df(self) -> pd.DataFrame:
-        return self._no_prez_aggregate_df
-
-    @no_prez_aggregate_df.setter
-    def no_prez_aggregate_df(self, agg_df) -> None:
-        self._no_prez_aggregate_df = agg_df
-
-    @property
-    def no_prez_melt_df(self) -> pd.DataFrame:
-        return self._no_prez_melt_df
-
-    @no_prez_melt_df.setter
-    def no_prez_melt_df(self, melt_df) -> None:
-        self._no_prez_melt_df = melt_df
-
 class FDSReport(Report):
 
     def __init__(self, config_file: Optional[str] = CONFIG_FILE) -> None:
@@ -457,22 +391,42 @@ class FDSReport(Report):
 
         fds = utils.rename_columns(fds, config_keys=self.config["Enrollment"])
 
+        # Students reporting an internship employer count as having interned even when the
+        # flag is 0. Derived here at load time, touching only the two narrow columns it
+        # needs, before the frame is widened by the timeline merge and pivot
+        conds = [fds["internships"].eq("0") & fds["internship_emp"].notna() & fds["internship_emp"].ne("NA")]
+        choices = ["1"]
+        fds["internships"] = np.select(conds, choices, default=fds["internships"].to_numpy())
+
         fds["Date"] = pd.to_datetime(fds["Date"]).dt.tz_localize(None)
-        fds["internships"] = fds.apply(lambda x: "1" if x["internships"] == "0" and (x["internship_emp"] != "NA" and pd.notna(x["internship_emp"])) else x["internships"], axis=1)
 
         fds = fds.loc[:, ~fds.columns.duplicated(keep='first')].copy()
 
+        # Categorical join keys with shared categories let both Student_ID merges below
+        # factorize over integer codes rather than strings. The dtype spans both sides'
+        # ids so no value falls outside the categories; assign leaves the caller's
+        # timeline frame untouched
+        id_dtype = pd.CategoricalDtype(pd.concat([fds["Student_ID"], timeline["Student_ID"]], ignore_index=True).dropna().unique())
+        fds["Student_ID"] = fds["Student_ID"].astype(id_dtype)
+        timeline = timeline.assign(Student_ID=timeline["Student_ID"].astype(id_dtype))
+
         # Merge the timeline with the student successes. Using an outer merge because there are students with FDS that have 0 entry into the timeline
-        timeline_targs = pd.merge(fds[["Student_ID", "Date"]], 
-                                  timeline, how="left", on=["Student_ID"], suffixes=("_fds", "_tl"))
+        timeline_targs = pd.merge(fds[["Student_ID", "Date"]],
+                                  timeline, how="left", on=["Student_ID"], suffixes=("_fds", "_tl"), validate="m:m")
+
+        # Remove any instances where a person has returned to doing events after their FDS reponse has been recorded.
+        # Date_tl is the timeline's %Y%m%d string key, so the FDS datetimes are rendered
+        # to the same form for a like-typed, lexicographically correct comparison
+        timeline_targs = timeline_targs.loc[timeline_targs["Date_tl"] < timeline_targs["Date_fds"].dt.strftime('%Y%m%d'), :]
 
-        # Remove any instances where a person has returned to doing events after their FDS reponse has been recorded
-        timeline_targs = timeline_targs.loc[timeline_targs["Date_tl"] < timeline_targs["Date_fds"], :]
+        # Low-cardinality string columns become categoricals so the groupby below hashes
+        # small integer codes instead of strings; observed=True keeps unused combinations out
+        for col in ["Event_Type", "college_year"]:
+            timeline_targs[col] = timeline_targs[col].astype("category")
 
         ## AGGREGATION
-        # Pivot to create columns like "Event Senior" so we can split up event and class descriptions
-        student_event_counts = pd.pivot_table(timeline_targs[["Student_ID", "Event_Type", "college_year", "fg"]], 
-                                              index=["Student_ID", "fg"], columns=["Event_Type", "college_year"], aggfunc=len)
+        # Count per group then unstack to create columns like "Event Senior" so we can split up event and class descriptions
+        student_event_counts = timeline_targs.groupby(["Student_ID", "fg", "Event_Type", "college_year"], observed=True).size().unstack(["Event_Type", "college_year"])
 
         # Rename and clean columns
         student_event_counts.columns = [' '.join(col) for col in student_event_counts.columns]
@@ -481,7 +435,7 @@ class FDSReport(Report):
         ## Obtain Total Counts
         # Merge timeline counts to p_status
         success_df = pd.merge(fds.loc[fds["college_level"] == "Undergraduate", ["Student_ID", "outcome", "internships", "gender", "honors_college", "gpa", "athlete_status", "urm_status",
-                                                                                "FDS_year", "college_program", "college_major"]].drop_duplicates(), student_event_counts, on=["Student_ID"], how="left")
+                                                                                "FDS_year", "college_program", "college_major"]].drop_duplicates(), student_event_counts, on=["Student_ID"], how="left", validate="m:m")
 
         # Ignore missing p_statuses
         success_df = success_df.dropna(subset=["outcome"])
@@ -499,23 +453,20 @@ class FDSReport(Report):
                         "Serving in the Military": "1",
                         "Volunteer or Service Program": "1"}
 
+        # Mapping over a categorical touches each distinct outcome once, not each row
+        success_df["outcome"] = success_df["outcome"].astype("category")
         success_df["outcome_desc"] = success_df["outcome"]
-        success_df["outcome"]= success_df["outcome"].map(success_dict)
-
-        # Create totals counts for each event type
-        events_cols = [col for col in success_df if col.startswith('Events')]
-        appt_cols = [col for col in success_df if col.startswith('Appointments')]
-        cf_cols = [col for col in success_df if col.startswith('Career')]
-        apps_cols = [col for col in success_df if col.startswith('Applications')]
-        logins_cols = [col for col in success_df if col.startswith('Logins')]
-        # emp_apps_cols = [col for col in success_df if col.endswith('Employment Appointments')]
-
-        # Create Total cols
-        success_df["Total Events"] = success_df[events_cols].astype(int).sum(axis=1)
-        success_df["Total Appointments"] = success_df[appt_cols].astype(int).sum(axis=1)
-        success_df["Total Career Fairs"] = success_df[cf_cols].astype(int).sum(axis=1)
-        success_df["Total Applications"] = success_df[apps_cols].astype(int).sum(axis=1)
-        success_df["Total Logins"] = success_df[logins_cols].astype(int).sum(axis=1)
+        success_df["outcome"] = success_df["outcome"].map(success_dict)
+
+        # Create totals counts for each event type with one grouped sum over the count
+        # matrix instead of five separate column-scan + sum passes
+        prefix_totals = {"Events": "Total Events", "Appointments": "Total Appointments", "Career": "Total Career Fairs",
+                         "Applications": "Total Applications", "Logins": "Total Logins"}
+        groups = success_df.columns.to_series().str.extract(r'^(Events|Appointments|Career|Applications|Logins)')[0]
+        totals = success_df.loc[:, groups.notna().to_numpy()].astype(int).T.groupby(groups.dropna()).sum().T
+
+        for prefix, total_col in prefix_totals.items():
+            success_df[total_col] = totals[prefix] if prefix in totals.columns else 0
 
         success_df = success_df.drop_duplicates(subset="Student_ID")
 
@@ -527,9 +478,10 @@ class FDSReport(Report):
         # Create a melted df for Looker
         success_df_melt = success_df.melt(id_vars=id_vars, value_vars=value_vars, var_name="Event_Type", value_name="Count")
 
-        # Add columns
-        success_df_melt['Year'] = success_df_melt['Event_Type'].str.split(' ').str[-1]
-        success_df_melt['Event_Type'] = success_df_melt['Event_Type'].str.split(' ').str[0:-1].str.join(' ')
+        # Add columns; one rsplit pass yields both the year suffix and the event type prefix
+        parts = success_df_melt['Event_Type'].str.rsplit(' ', n=1, expand=True)
+        success_df_melt['Event_Type'] = parts[0]
+        success_df_melt['Year'] = parts[1]
 
         logging.debug("successfully created aggregate and melted FDS reports")
         print(f'{Fore.GREEN} FDS Reports successfully generated! {Style.RESET_ALL}')
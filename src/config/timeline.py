@@ -1,16 +1,31 @@
+import numpy as np
 import pandas as pd
 import logging
 from typing import List, Optional
 
-from colorama import init as colorama_init
-from colorama import Fore
-from colorama import Style
+# Imported lazily-tolerant: the success message degrades to plain text when
+# colorama is absent, and nothing runs at import time
+try:
+    from colorama import Fore
+    from colorama import Style
+except ImportError:
+    Fore = Style = None
 
 from src.config.config import Config
 from src.utils import utils
 
+# Optional fast path for process_timeline; the pandas implementation is used when absent
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 CONFIG_FILE = "src\\config\\csv.config.JSON"
-colorama_init()
+
+# Term key by calendar month, built once at import: Jan-Apr -> Winter '10',
+# May-Aug -> Summer '30', Sep-Dec -> Fall '40'; index 0 catches missing dates
+_MONTH_TO_KEY = np.array([''] + ['10'] * 4 + ['30'] * 4 + ['40'] * 4, dtype='U2')
+_MONTH_TO_KEY_DICT = {month: key for month, key in enumerate(_MONTH_TO_KEY[1:].tolist(), start=1)}
 
 class Timeline(Config):
     def __init__(self, config_file: Optional[str] = CONFIG_FILE) -> None:
@@ -31,23 +46,47 @@ class Timeline(Config):
             - Output is saved as enrollment attribute.
         '''
 
-        df = pd.read_csv(self.config["Enrollment"]["path"], dtype=str)
+        config_keys = self.config["Enrollment"]
+
+        # Only the configured source columns are worth parsing; everything else is
+        # dropped before it materializes. Arrow-backed strings keep the columns in
+        # contiguous buffers instead of one Python object per cell (dtype=str still
+        # guards leading zeros in identifiers)
+        usecols = {value["col_name"] for value in config_keys.values() if isinstance(value, dict) and "col_name" in value}
+        df = pd.read_csv(config_keys["path"], dtype=str, dtype_backend="pyarrow", usecols=lambda col: col in usecols)
 
         if process:
             # Rename columns for appropriate handling
-            df = utils.rename_columns(df=df, config_keys=self.config["Enrollment"])
+            df = utils.rename_columns(df=df, config_keys=config_keys)
 
             try:
+                # Filter before dedup so drop_duplicates only hashes the rows that
+                # can survive the college_year cut
+                df = df.loc[df["college_year"].isin({"Freshman", "Sophomore", "Junior", "Senior"}), :]
                 df = df.drop_duplicates(keep="first")
-                df = df.loc[df["college_year"].isin(["Freshman", "Sophomore", "Junior", "Senior"]), :]
-
-                df["Year"] = df["term_code_key"].str[:4]
-                df['Term Code'] = df["term_code_key"].str[-2:]
 
-                seasonal_mapping = {'35':'40', '5':'10', '25':'30'}
-                df["Term Code"] = df["Term Code"].replace(seasonal_mapping)
+                key = df["term_code_key"]
+                if (key.str.len() == 6).all():
+                    # Fixed-width codes: view the column as a char matrix and slice
+                    # columns in C rather than slicing each value at the Python level
+                    codes = key.to_numpy(dtype="U6")
+                    df["Year"] = codes.astype("U4")
+                    df['Term Code'] = codes.view("U1").reshape(-1, 6)[:, 4:].copy().view("U2").ravel()
+                else:
+                    df["Year"] = key.str[:4]
+                    df['Term Code'] = key.str[-2:]
+
+                # Remap the off-cycle codes onto their main-term codes with nested
+                # np.where instead of .replace, which dispatches through a Python dict
+                tc = df["Term Code"].to_numpy()
+                df["Term Code"] = np.where(tc == '35', '40', np.where(tc == '5', '10', np.where(tc == '25', '30', tc)))
                 df = df.loc[df["Term Code"].isin(['40', '10', '30']), :]
 
+                # These low-cardinality labels become categoricals so downstream merges,
+                # isin and groupbys hash small integer codes instead of strings
+                for col in ["college_year", "Year", "Term Code"]:
+                    df[col] = df[col].astype("category")
+
                 logging.debug("enrollment processing completed")
 
             except Exception as e:
@@ -67,6 +106,27 @@ class Timeline(Config):
         Output is appended to the contents attribute of the Timeline object.
         '''
 
+        if report is not None:
+            # Project down to the timeline columns right away so wide report frames
+            # are not held in memory until the concat; columns a report lacks
+            # (Events_Name for some sources) are filled with NaN at concat time
+            cols = [col for col in ("Email", "Student_ID", "Date", "Event_Type", "Events_Name") if col in report.columns]
+            report = report.loc[:, cols]
+
+            # Settle Date into datetime64 here so process_timeline's .dt accessors read
+            # int64 buffers directly instead of re-parsing strings on every call; reports
+            # that came through col_typing are already datetime and skip the parse
+            if "Date" in report.columns and not pd.api.types.is_datetime64_any_dtype(report["Date"]):
+                report["Date"] = pd.to_datetime(report["Date"], format="mixed", errors="coerce", cache=True)
+
+            # Reports read through the configured CSV path are already Arrow-backed;
+            # frames arriving with object-dtype string columns (older caches, ad-hoc
+            # callers) get moved into the same contiguous string buffers here so the
+            # concat and merges downstream stay on Arrow kernels
+            obj_cols = report.columns[report.dtypes == object]
+            if len(obj_cols):
+                report[obj_cols] = report[obj_cols].astype("str")
+
         self._contents.append(report)
         logging.debug(f"successfully added {tag} to timeline object")
 
@@ -79,17 +139,37 @@ class Timeline(Config):
             - Sets the Timeline object's timeline attribute to this dataframe.
         
         '''
-        df = pd.DataFrame({})
+        contents = self.contents
 
-        try: 
-            for content in self.contents:
-                df = pd.concat([df, content])
+        if not contents:
+            logging.error("no reports have been added to the timeline")
+            raise Exception("no reports have been added to the timeline")
+
+        # Validate the inputs up front instead of wrapping the concat in a bare
+        # except: a report that failed to load or a column missing from every
+        # source fails here with the actual cause
+        if any(report is None for report in contents):
+            logging.error("cannot concat. timeline because a report failed to load")
+            raise Exception("cannot concat. timeline because a report failed to load")
+
+        required = ["Email", "Student_ID", "Date", "Event_Type", "Events_Name"]
+        missing = [col for col in required if not any(col in report.columns for report in contents)]
+        if missing:
+            logging.error(f"reports are missing required timeline columns {missing}")
+            raise Exception(f"reports are missing required timeline columns {missing}")
+
+        # One concat copies each report's rows once, instead of recopying the whole
+        # accumulated frame on every iteration
+        df = pd.concat(contents, ignore_index=True)
+
+        df = df.loc[:, required]
+
+        # Only a handful of event types exist across every report, so the
+        # concatenated column compresses well as a categorical. Cast after the
+        # concat; per-report categoricals with different categories would fall
+        # back to object when concatenated
+        df["Event_Type"] = df["Event_Type"].astype("category")
 
-            df = df.loc[:, ["Email", "Student_ID", "Date", "Event_Type", "Events_Name"]]
-        except:
-            logging.error("failed to concat. all reports to timeline")
-            raise "failed to concat. all reports to timeline"
-        
         logging.debug(f"successfully concat. all reports to timeline")
 
         self.timeline = df
@@ -111,37 +191,90 @@ class Timeline(Config):
             - Sets Timeline object's timeline attribute to this df.
         
         '''
-        value_list = [('10', "Winter")] * 4 + [('30', 'Summer')] * 4 + [('40', 'Fall')] * 4
-        key_list = list(range(1, 13))
-        months_2key_dict = dict(zip(key_list, value_list))
+        if pl is not None:
+            return self._process_timeline_polars()
 
+        # Bind the property-backed attributes once up front; everything below works
+        # on the locals rather than re-resolving the descriptors
         timeline = self.timeline
+        enrollment = self.enrollment
 
         try:
+            # Rows without an identifier can never join enrollment, so cut them before
+            # spending time deriving Month/Year/Key for them
+            timeline = timeline.dropna(subset=["Student_ID"])
             timeline["Month"] = timeline["Date"].dt.month
             timeline["Year"] = timeline["Date"].dt.year.astype("str")
-            timeline["Key"] = timeline["Month"].map({key: value[0] for key, value in months_2key_dict.items()})
-            timeline = timeline.loc[~timeline["Student_ID"].isnull(), :]
-            self.enrollment["Year"] = self.enrollment["Year"].astype("str")
-
-            timeline = pd.merge(self.enrollment, timeline, how="left", left_on=["Student_ID", "Year", "Term Code"], right_on=["Student_ID", "Year", "Key"])
+            # One fancy-index gather instead of a per-row dict lookup through .map
+            timeline["Key"] = _MONTH_TO_KEY[timeline["Month"].fillna(0).astype("int64").to_numpy()]
+            enrollment["Year"] = enrollment["Year"].astype("str")
+
+            # Inner join: the left join's unmatched enrollment rows carried a null
+            # Event_Type and were dropped by the filter below anyway, so they are
+            # never materialized in the first place
+            timeline = pd.merge(enrollment, timeline, how="inner", left_on=["Student_ID", "Year", "Term Code"], right_on=["Student_ID", "Year", "Key"])
             timeline = timeline[timeline["Event_Type"].notna()]
             timeline = timeline.sort_values(["Student_ID", "Date"], ascending=True)
-            timeline["Date"] = timeline["Date"].dt.strftime('%Y%m%d')
-
-            timeline = timeline.astype(str)
+            # Compose the %Y%m%d key arithmetically on the year/month/day buffers and
+            # cast the digits once, instead of strftime calling Python per element.
+            # Downstream reports compare on this string form, so it stays a string
+            d = timeline["Date"].dt
+            timeline["Date"] = (d.year * 10000 + d.month * 100 + d.day).to_numpy().astype("int64").astype("U8")
 
             self.timeline = timeline
 
             logging.debug("successfully processed timeline")
+            print(f'{getattr(Fore, "GREEN", "")} Timeline report successfully processed! {getattr(Style, "RESET_ALL", "")}')
             return self.timeline
         except Exception as e:
             logging.error("error processing timeline")
             raise f"error processing timeline: {e}"
 
-    logging.debug("Successfully processed timeline report")
-    print(f'{Fore.GREEN} Timeline report successfully processed! {Style.RESET_ALL}')
+    def _process_timeline_polars(self) -> pd.DataFrame:
+        '''
+        Polars lazy-frame implementation of process_timeline. The month/year/key derivation, null filters, enrollment join, sort and date
+        formatting are expressed as one lazy query so the planner fuses them into few passes over Arrow buffers instead of materializing
+        an intermediate per operation. Produces the same timeline attribute as the pandas path.
+
+        Returns:
+            - DataFrame: Dataframe of all enrolled student timelines for students participating in some engagement type.
+        '''
+        try:
+            lt = (
+                pl.from_pandas(self.timeline).lazy()
+                .filter(pl.col("Student_ID").is_not_null())
+                .with_columns([
+                    pl.col("Date").dt.month().alias("Month"),
+                    pl.col("Date").dt.year().cast(pl.Utf8).alias("Year"),
+                    pl.col("Date").dt.month().replace_strict(_MONTH_TO_KEY_DICT, default=None).alias("Key"),
+                ])
+                # polars consumes the right-side join key; join on a scratch copy so
+                # Key survives into the output like it does on the pandas path
+                .with_columns(pl.col("Key").alias("_join_key"))
+            )
+            # Join keys are cast to Utf8 since polars refuses to join Categorical against Utf8
+            le = pl.from_pandas(self.enrollment).lazy().with_columns([
+                pl.col("Year").cast(pl.Utf8),
+                pl.col("Term Code").cast(pl.Utf8),
+            ])
+
+            timeline = (
+                le.join(lt, left_on=["Student_ID", "Year", "Term Code"], right_on=["Student_ID", "Year", "_join_key"], how="left")
+                .filter(pl.col("Event_Type").is_not_null())
+                .sort(["Student_ID", "Date"])
+                .with_columns(pl.col("Date").dt.strftime('%Y%m%d'))
+                .collect()
+                .to_pandas()
+            )
+
+            self.timeline = timeline
 
+            logging.debug("successfully processed timeline (polars)")
+            print(f'{getattr(Fore, "GREEN", "")} Timeline report successfully processed! {getattr(Style, "RESET_ALL", "")}')
+            return self.timeline
+        except Exception as e:
+            logging.error("error processing timeline")
+            raise Exception(f"error processing timeline: {e}") from e
 
     @property
     def enrollment(self) -> pd.DataFrame:
@@ -16,12 +16,10 @@ def rename_columns(df: pd.DataFrame, config_keys: dict) -> pd.DataFrame:
         - df (DataFrame): pandas dataframe of original dataframe with renamed columns
     '''
 
-    for col in config_keys:
-            try:
-                df = df.rename(columns={config_keys[col]["col_name"]: col})
-            except:
-                pass
-    return df
+    # One rename call with the full mapping walks the column Index once instead of
+    # rebuilding it per configured column; names absent from the frame are ignored
+    mapping = {value["col_name"]: col for col, value in config_keys.items() if isinstance(value, dict) and "col_name" in value}
+    return df.rename(columns=mapping)
 
 def get_latest_file_path(path: str) -> Optional[str]:
     '''
@@ -34,8 +32,10 @@ def get_latest_file_path(path: str) -> Optional[str]:
         - file(str): The most recent file string
     '''
     try:
-        files = sorted(glob.glob(f"{path}"), reverse=True)
-        return files[0] if files else None
+        # The date-stamped filenames sort lexicographically, so a single max pass
+        # over the glob iterator picks the latest without materializing and
+        # sorting the whole match list
+        return max(glob.iglob(path), default=None)
     except Exception as e:
         logging.error(f"error retriveving files from path {path}: {e}")
         return None
@@ -74,24 +74,21 @@ def generate_com1100_report(com1100_student_group: pd.DataFrame, timeline: pd.Da
 
     com1100_timelines = pd.merge(com1100_student_group, timeline[["Student_ID", "Event_Type", "Date"]], on="Student_ID", how="left", suffixes=('_prez', '_eng'))
 
-    try:
+    # The "no presentation" student group carries no Date column, so the merge
+    # produces no Date_prez/Date_eng pair and every engagement counts; when the
+    # pair exists both sides are %Y%m%d strings and compare lexicographically
+    if "Date_prez" in com1100_timelines.columns:
         com1100_timelines = com1100_timelines[com1100_timelines["Date_prez"] <= com1100_timelines["Date_eng"]]
-    except:
-        pass
-
-    com1100_agg = pd.pivot_table(com1100_timelines[["Student_ID", "Event_Type", "college_program", "college_major", "term_code_key"]], 
-                                    index=["Student_ID", "college_program", "college_major", "term_code_key"], columns=["Event_Type"], aggfunc=len, fill_value=0)
- 
-    com1100_agg.reset_index(inplace=True)
 
-    com1100_agg = com1100_agg.fillna(0)
+    # groupby().size().unstack() counts in one cython pass over the key codes,
+    # skipping pivot_table's generic aggregation dispatch
+    com1100_agg = (com1100_timelines.groupby(["Student_ID", "college_program", "college_major", "term_code_key", "Event_Type"], observed=True)
+                   .size().unstack("Event_Type", fill_value=0).reset_index())
 
     com1100_melt = com1100_agg.melt(id_vars=["Student_ID", "college_program", "college_major", "term_code_key"],
                         value_vars=["Applications", "Appointments", "Career_Fairs", "Events", "Logins"],
                         var_name="Event_Type", value_name="Count")
 
-    com1100_melt.fillna(0, inplace=True)
-
     com1100_agg["Tag"] = tag
     com1100_melt["Tag"] = tag
 